@@ -9,12 +9,13 @@ It reads the compose file, patches image tags, and calls the Portainer API to de
 import argparse
 import json
 import os
+import re
 import sys
 import time
 from urllib.parse import urljoin
 
-import requests
-import yaml
+# Seconds a cached stack list stays valid (see PORTAINER_STACKS_CACHE)
+STACKS_CACHE_TTL = 10
 
 
 def parse_arguments():
@@ -40,6 +41,8 @@ def parse_arguments():
                         help='Prune services on deploy')
     parser.add_argument('--pull', action='store_true',
                         help='Pull images on deploy')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Always fetch the stack list from Portainer')
     return parser.parse_args()
 
 
@@ -65,13 +68,44 @@ def validate_args(args):
 
 
 def read_compose_file(file_path):
-    """Read and parse the compose file."""
+    """Read and parse the compose file, reusing a JSON cache while it is up to date."""
+    import yaml
+
+    cache_path = f"{file_path}.cache.json"
+    try:
+        if os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(file_path):
+            with open(cache_path, 'r') as f:
+                return json.load(f)
+    except Exception as e:
+        print(f"Warning: Ignoring unreadable compose cache: {e}")
+    
     try:
         with open(file_path, 'r') as f:
-            return yaml.safe_load(f)
+            compose_data = yaml.load(f, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader))
     except Exception as e:
         print(f"Error reading compose file: {e}")
         sys.exit(1)
+    
+    # Only cache documents JSON reproduces exactly (no dates, no non-string keys)
+    try:
+        serialized = json.dumps(compose_data)
+        cacheable = json.loads(serialized) == compose_data
+    except (TypeError, ValueError):
+        cacheable = False
+    
+    if cacheable:
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                f.write(serialized)
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            print(f"Warning: Could not write compose cache: {e}")
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    
+    return compose_data
 
 
 def update_image_tags(compose_data, registry_url, project_path, image_tag):
@@ -80,50 +114,95 @@ def update_image_tags(compose_data, registry_url, project_path, image_tag):
         print("Warning: Missing registry URL, project path, or image tag. Skipping image tag update.")
         return compose_data
     
+    # Only update images that match our project path
+    pattern = re.compile(re.escape(project_path), re.IGNORECASE)
     for service_name, service_config in compose_data.get('services', {}).items():
-        if 'image' in service_config:
-            # Only update images that match our project path
-            if project_path.lower() in service_config['image'].lower():
-                # Replace the image tag
-                image_parts = service_config['image'].split(':')
-                base_image = image_parts[0]
-                service_config['image'] = f"{base_image}:{image_tag}"
-                print(f"Updated image for service {service_name}: {service_config['image']}")
+        if 'image' in service_config and pattern.search(service_config['image']):
+            # Replace the image tag, keeping any registry port (registry:5000/repo:tag)
+            base_image, sep, tag = service_config['image'].rpartition(':')
+            if not sep or '/' in tag:
+                base_image = service_config['image']
+            service_config['image'] = f"{base_image}:{image_tag}"
+            print(f"Updated image for service {service_name}: {service_config['image']}")
     
     return compose_data
 
 
-def get_stack_id(portainer_url, api_key, env_id, stack_name):
-    """Get the stack ID for an existing stack."""
-    url = urljoin(portainer_url, f"/api/stacks")
-    headers = {
+def create_session(api_key):
+    """Create a pooled HTTP session authenticated against the Portainer API."""
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    session = requests.Session()
+    session.headers.update({
         'X-API-Key': api_key,
         'Content-Type': 'application/json'
-    }
+    })
+    # Only retry statuses that mean the request never reached Portainer; a 500
+    # is a real deploy failure, and raise_on_status=False lets raise_for_status
+    # surface its body instead of a bare RetryError
+    retries = Retry(
+        total=3,
+        backoff_factor=1.0,
+        status_forcelist=[429, 502, 503, 504],
+        allowed_methods=['GET', 'POST', 'PUT'],
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=retries)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def load_stacks(session, portainer_url, use_cache=True):
+    """Fetch the stack list, reusing a short-lived on-disk copy when configured."""
+    cache_path = os.getenv('PORTAINER_STACKS_CACHE') if use_cache else None
+    try:
+        if cache_path and os.path.exists(cache_path):
+            if time.time() - os.path.getmtime(cache_path) < STACKS_CACHE_TTL:
+                with open(cache_path, 'r') as f:
+                    cached = json.load(f)
+                # Only reuse stack IDs fetched from the same Portainer instance
+                if cached.get('portainer_url') == portainer_url:
+                    return cached['stacks']
+    except Exception as e:
+        print(f"Warning: Ignoring unreadable stacks cache: {e}")
+    
+    url = urljoin(portainer_url, f"/api/stacks")
+    response = session.get(url)
+    response.raise_for_status()
+    stacks = response.json()
+    
+    if cache_path:
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump({'portainer_url': portainer_url, 'stacks': stacks}, f)
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            print(f"Warning: Could not write stacks cache: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
     
+    return stacks
+
+
+def get_stack_id(session, portainer_url, env_id, stack_name, use_cache=True):
+    """Get the stack ID for an existing stack."""
     try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        
-        stacks = response.json()
-        for stack in stacks:
-            if stack.get('Name') == stack_name and stack.get('EndpointId') == env_id:
-                return stack.get('Id')
-        
-        return None
+        stacks = load_stacks(session, portainer_url, use_cache)
+        index = {(stack.get('Name'), stack.get('EndpointId')): stack.get('Id') for stack in stacks}
+        return index.get((stack_name, env_id))
     except Exception as e:
         print(f"Error getting stack ID: {e}")
         return None
 
 
-def create_stack(portainer_url, api_key, env_id, stack_name, compose_content, prune, pull):
+def create_stack(session, portainer_url, env_id, stack_name, compose_content, prune, pull):
     """Create a new stack in Portainer."""
     url = urljoin(portainer_url, f"/api/stacks")
-    headers = {
-        'X-API-Key': api_key,
-        'Content-Type': 'application/json'
-    }
-    
     payload = {
         'name': stack_name,
         'stackFileContent': compose_content,
@@ -135,25 +214,29 @@ def create_stack(portainer_url, api_key, env_id, stack_name, compose_content, pr
     }
     
     try:
-        response = requests.post(url, headers=headers, json=payload)
+        response = session.post(url, json=payload)
         response.raise_for_status()
         print(f"Stack {stack_name} created successfully!")
-        return response.json().get('Id')
+        stack_id = response.json().get('Id')
     except Exception as e:
         print(f"Error creating stack: {e}")
-        if hasattr(e, 'response') and e.response:
+        if getattr(e, 'response', None) is not None:
             print(f"Response: {e.response.text}")
         sys.exit(1)
+    
+    # The cached stack list no longer includes the new stack
+    cache_path = os.getenv('PORTAINER_STACKS_CACHE')
+    try:
+        if cache_path and os.path.exists(cache_path):
+            os.remove(cache_path)
+    except OSError as e:
+        print(f"Warning: Could not invalidate stacks cache: {e}")
+    return stack_id
 
 
-def update_stack(portainer_url, api_key, stack_id, env_id, compose_content, prune, pull):
+def update_stack(session, portainer_url, stack_id, env_id, compose_content, prune, pull):
     """Update an existing stack in Portainer."""
     url = urljoin(portainer_url, f"/api/stacks/{stack_id}")
-    headers = {
-        'X-API-Key': api_key,
-        'Content-Type': 'application/json'
-    }
-    
     payload = {
         'stackFileContent': compose_content,
         'env': [],  # Environment variables
@@ -162,13 +245,13 @@ def update_stack(portainer_url, api_key, stack_id, env_id, compose_content, prun
     }
     
     try:
-        response = requests.put(url, headers=headers, json=payload)
+        response = session.put(url, json=payload)
         response.raise_for_status()
         print(f"Stack updated successfully!")
         return True
     except Exception as e:
         print(f"Error updating stack: {e}")
-        if hasattr(e, 'response') and e.response:
+        if getattr(e, 'response', None) is not None:
             print(f"Response: {e.response.text}")
         sys.exit(1)
 
@@ -186,22 +269,33 @@ def main():
         )
     
     # Convert to YAML string
-    compose_content = yaml.dump(compose_data)
+    import yaml
+    compose_content = yaml.dump(
+        compose_data,
+        Dumper=getattr(yaml, 'CSafeDumper', yaml.SafeDumper),
+        sort_keys=False,
+        default_flow_style=False,
+        allow_unicode=True
+    )
+    
+    session = create_session(args.api_key)
     
     # Check if stack exists
-    stack_id = get_stack_id(args.portainer_url, args.api_key, args.env_id, args.stack_name)
+    stack_id = get_stack_id(
+        session, args.portainer_url, args.env_id, args.stack_name, not args.no_cache
+    )
     
     # Deploy stack
     if stack_id:
         print(f"Updating existing stack {args.stack_name} (ID: {stack_id})...")
         update_stack(
-            args.portainer_url, args.api_key, stack_id, args.env_id, 
+            session, args.portainer_url, stack_id, args.env_id, 
             compose_content, args.prune, args.pull
         )
     else:
         print(f"Creating new stack {args.stack_name}...")
         create_stack(
-            args.portainer_url, args.api_key, args.env_id, args.stack_name, 
+            session, args.portainer_url, args.env_id, args.stack_name, 
             compose_content, args.prune, args.pull
         )
     
@@ -1,30 +1,89 @@
 """
 Minimal Prometheus Pushgateway example for CI metrics.
+
+Pass --labels several times (e.g. once per test suite) to push every label
+set in a single request. Each repeated set carries its own values as
+'labels:failures:duration', e.g. --labels 'suite=unit:2:0.4'.
 """
 
+import argparse
 import os
+import random
 import time
 import requests
+from requests.adapters import HTTPAdapter
+
+
+def retry_with_backoff(func, retries=3, base=1.0, cap=30.0, jitter=0.5):
+    """Call func, retrying transient connection errors with exponential backoff."""
+    for attempt in range(retries + 1):
+        try:
+            return func()
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            if attempt == retries:
+                raise
+            delay = min(cap, base * 2 ** attempt * (1 + random.uniform(0, jitter)))
+            print(f"Push failed ({e}); retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+
+def parse_label_spec(spec):
+    """Split 'labels[:failures:duration]' into (labels, failures, duration).
+
+    Failures and duration are None when the spec carries only labels.
+    """
+    parts = spec.rsplit(":", 2)
+    if len(parts) == 3:
+        labels, failures, duration = parts
+        return labels, int(failures), float(duration)
+    return spec, None, None
+
+
+def build_payload(samples):
+    """Render (labels, failures, duration) samples as one exposition-format body."""
+    # Samples of the same metric must be contiguous in the exposition format
+    metrics = [f"test_runs_total{{{labels}}} 1" for labels, _, _ in samples]
+    metrics += [f"test_failures_total{{{labels}}} {failures}" for labels, failures, _ in samples]
+    metrics += [f"avg_test_duration_seconds{{{labels}}} {duration}" for labels, _, duration in samples]
+    return "\n".join(metrics) + "\n"
 
 
 def main():
-    gateway = os.getenv("PUSHGATEWAY_URL", "http://localhost:9091")
-    job = os.getenv("METRICS_JOB", "qa_tests")
-    labels = os.getenv("METRICS_LABELS", "branch=dev")
-
-    metrics = [
-        f"test_runs_total{{{labels}}} 1",
-        f"test_failures_total{{{labels}}} {int(os.getenv('TEST_FAILURES', '0'))}",
-        f"avg_test_duration_seconds{{{labels}}} {float(os.getenv('AVG_DURATION', '0.0'))}",
-    ]
-    payload = "\n".join(metrics) + "\n"
-
-    url = f"{gateway}/metrics/job/{job}"
-    resp = requests.post(url, data=payload.encode("utf-8"))
+    parser = argparse.ArgumentParser(description="Push CI metrics to a Prometheus Pushgateway")
+    parser.add_argument("--gateway", default=os.getenv("PUSHGATEWAY_URL", "http://localhost:9091"))
+    parser.add_argument("--job", default=os.getenv("METRICS_JOB", "qa_tests"))
+    parser.add_argument("--labels", action="append",
+                        help="Label set such as 'branch=dev,suite=unit'; when repeated, "
+                             "give each set its values as 'labels:failures:duration'")
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--backoff", type=float, default=1.0)
+    args = parser.parse_args()
+
+    samples = [parse_label_spec(spec) for spec in args.labels or [os.getenv("METRICS_LABELS", "branch=dev")]]
+    if len(samples) == 1 and samples[0][1] is None:
+        # A single label set keeps reading its values from the CI environment
+        samples = [(samples[0][0], int(os.getenv("TEST_FAILURES", "0")), float(os.getenv("AVG_DURATION", "0.0")))]
+    elif any(failures is None for _, failures, _ in samples):
+        parser.error("repeated --labels need per-set values as 'labels:failures:duration'")
+    payload = build_payload(samples)
+
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+    session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+    headers = {
+        "Content-Type": "text/plain; version=0.0.4",
+        "Connection": "keep-alive",
+    }
+
+    url = f"{args.gateway}/metrics/job/{args.job}"
+    resp = retry_with_backoff(
+        lambda: session.post(url, data=payload.encode("utf-8"), headers=headers),
+        retries=args.retries,
+        base=args.backoff,
+    )
     resp.raise_for_status()
-    print("Pushed metrics to", url)
+    print(f"Pushed metrics for {len(samples)} label set(s) to", url)
 
 
 if __name__ == "__main__":
     main()
-
@@ -9,12 +9,18 @@ It retrieves the previous successful image tag and updates the stack.
 import argparse
 import json
 import os
+import re
 import sys
 import time
 from urllib.parse import urljoin
 
-import requests
-import yaml
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Seconds a cached stack list stays valid (see PORTAINER_STACKS_CACHE)
+STACKS_CACHE_TTL = 10
 
 
 def parse_arguments():
@@ -38,6 +44,10 @@ def parse_arguments():
                         help='Previous image tag to rollback to')
     parser.add_argument('--artifact-path', default=os.getenv('ARTIFACT_PATH', 'artifacts/last_successful_tag.json'),
                         help='Path to artifact file containing last successful tag')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Always fetch the stack list from Portainer')
+    parser.add_argument('--compact-history', action='store_true',
+                        help='Fold rollback_history.ndjson into rollback_history.json and exit')
     return parser.parse_args()
 
 
@@ -63,13 +73,57 @@ def validate_args(args):
 
 
 def read_compose_file(file_path):
-    """Read and parse the compose file."""
+    """Read and parse the compose file, reusing a JSON cache while it is up to date."""
+    import yaml
+
+    cache_path = f"{file_path}.cache.json"
+    try:
+        if os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(file_path):
+            with open(cache_path, 'r') as f:
+                return json.load(f)
+    except Exception as e:
+        print(f"Warning: Ignoring unreadable compose cache: {e}")
+    
     try:
         with open(file_path, 'r') as f:
-            return yaml.safe_load(f)
+            compose_data = yaml.load(f, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader))
     except Exception as e:
         print(f"Error reading compose file: {e}")
         sys.exit(1)
+    
+    # Only cache documents JSON reproduces exactly (no dates, no non-string keys)
+    try:
+        serialized = json.dumps(compose_data)
+        cacheable = json.loads(serialized) == compose_data
+    except (TypeError, ValueError):
+        cacheable = False
+    
+    if cacheable:
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                f.write(serialized)
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            print(f"Warning: Could not write compose cache: {e}")
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    
+    return compose_data
+
+
+def parse_json(content):
+    """Parse JSON bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def load_json_file(file_path):
+    """Load a JSON document from disk."""
+    with open(file_path, 'rb') as f:
+        return parse_json(f.read())
 
 
 def get_previous_tag(args):
@@ -82,12 +136,11 @@ def get_previous_tag(args):
     # Otherwise, try to read from artifact file
     try:
         if os.path.exists(args.artifact_path):
-            with open(args.artifact_path, 'r') as f:
-                data = json.load(f)
-                tag = data.get('last_successful_tag')
-                if tag:
-                    print(f"Using last successful tag from artifact: {tag}")
-                    return tag
+            data = load_json_file(args.artifact_path)
+            tag = data.get('last_successful_tag')
+            if tag:
+                print(f"Using last successful tag from artifact: {tag}")
+                return tag
     except Exception as e:
         print(f"Warning: Could not read previous tag from artifact: {e}")
     
@@ -123,50 +176,95 @@ def update_image_tags(compose_data, registry_url, project_path, image_tag):
         print("Warning: Missing registry URL, project path, or image tag. Skipping image tag update.")
         return compose_data
     
+    # Only update images that match our project path
+    pattern = re.compile(re.escape(project_path), re.IGNORECASE)
     for service_name, service_config in compose_data.get('services', {}).items():
-        if 'image' in service_config:
-            # Only update images that match our project path
-            if project_path.lower() in service_config['image'].lower():
-                # Replace the image tag
-                image_parts = service_config['image'].split(':')
-                base_image = image_parts[0]
-                service_config['image'] = f"{base_image}:{image_tag}"
-                print(f"Updated image for service {service_name}: {service_config['image']}")
+        if 'image' in service_config and pattern.search(service_config['image']):
+            # Replace the image tag, keeping any registry port (registry:5000/repo:tag)
+            base_image, sep, tag = service_config['image'].rpartition(':')
+            if not sep or '/' in tag:
+                base_image = service_config['image']
+            service_config['image'] = f"{base_image}:{image_tag}"
+            print(f"Updated image for service {service_name}: {service_config['image']}")
     
     return compose_data
 
 
-def get_stack_id(portainer_url, api_key, env_id, stack_name):
-    """Get the stack ID for an existing stack."""
-    url = urljoin(portainer_url, f"/api/stacks")
-    headers = {
+def create_session(api_key):
+    """Create a pooled HTTP session authenticated against the Portainer API."""
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    session = requests.Session()
+    session.headers.update({
         'X-API-Key': api_key,
         'Content-Type': 'application/json'
-    }
+    })
+    # Only retry statuses that mean the request never reached Portainer; a 500
+    # is a real deploy failure, and raise_on_status=False lets raise_for_status
+    # surface its body instead of a bare RetryError
+    retries = Retry(
+        total=3,
+        backoff_factor=1.0,
+        status_forcelist=[429, 502, 503, 504],
+        allowed_methods=['GET', 'POST', 'PUT'],
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=retries)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def load_stacks(session, portainer_url, use_cache=True):
+    """Fetch the stack list, reusing a short-lived on-disk copy when configured."""
+    cache_path = os.getenv('PORTAINER_STACKS_CACHE') if use_cache else None
+    try:
+        if cache_path and os.path.exists(cache_path):
+            if time.time() - os.path.getmtime(cache_path) < STACKS_CACHE_TTL:
+                with open(cache_path, 'r') as f:
+                    cached = json.load(f)
+                # Only reuse stack IDs fetched from the same Portainer instance
+                if cached.get('portainer_url') == portainer_url:
+                    return cached['stacks']
+    except Exception as e:
+        print(f"Warning: Ignoring unreadable stacks cache: {e}")
     
+    url = urljoin(portainer_url, f"/api/stacks")
+    response = session.get(url)
+    response.raise_for_status()
+    stacks = response.json()
+    
+    if cache_path:
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump({'portainer_url': portainer_url, 'stacks': stacks}, f)
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            print(f"Warning: Could not write stacks cache: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    
+    return stacks
+
+
+def get_stack_id(session, portainer_url, env_id, stack_name, use_cache=True):
+    """Get the stack ID for an existing stack."""
     try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        
-        stacks = response.json()
-        for stack in stacks:
-            if stack.get('Name') == stack_name and stack.get('EndpointId') == env_id:
-                return stack.get('Id')
-        
-        return None
+        stacks = load_stacks(session, portainer_url, use_cache)
+        index = {(stack.get('Name'), stack.get('EndpointId')): stack.get('Id') for stack in stacks}
+        return index.get((stack_name, env_id))
     except Exception as e:
         print(f"Error getting stack ID: {e}")
         return None
 
 
-def update_stack(portainer_url, api_key, stack_id, env_id, compose_content, prune=False, pull=True):
+def update_stack(session, portainer_url, stack_id, env_id, compose_content, prune=False, pull=True):
     """Update an existing stack in Portainer."""
     url = urljoin(portainer_url, f"/api/stacks/{stack_id}")
-    headers = {
-        'X-API-Key': api_key,
-        'Content-Type': 'application/json'
-    }
-    
     payload = {
         'stackFileContent': compose_content,
         'env': [],  # Environment variables
@@ -175,19 +273,61 @@ def update_stack(portainer_url, api_key, stack_id, env_id, compose_content, prun
     }
     
     try:
-        response = requests.put(url, headers=headers, json=payload)
+        response = session.put(url, json=payload)
         response.raise_for_status()
         print(f"Stack updated successfully!")
         return True
     except Exception as e:
         print(f"Error updating stack: {e}")
-        if hasattr(e, 'response') and e.response:
+        if getattr(e, 'response', None) is not None:
             print(f"Response: {e.response.text}")
         sys.exit(1)
 
+
+def dump_json_line(entry):
+    """Serialize a history entry as a single NDJSON line."""
+    if orjson is not None:
+        return orjson.dumps(entry) + b'\n'
+    return json.dumps(entry).encode('utf-8') + b'\n'
+
+
+def record_rollback(history_dir, entry):
+    """Append a rollback entry to the NDJSON history log."""
+    rollback_log = os.path.join(history_dir, 'rollback_history.ndjson')
+    if history_dir:
+        os.makedirs(history_dir, exist_ok=True)
+    with open(rollback_log, 'ab') as f:
+        f.write(dump_json_line(entry))
+
+
+def compact_history(history_dir):
+    """Merge the NDJSON history log into the pretty-printed rollback_history.json array."""
+    rollback_log = os.path.join(history_dir, 'rollback_history.ndjson')
+    history_file = os.path.join(history_dir, 'rollback_history.json')
+    if not os.path.exists(rollback_log):
+        print(f"No rollback history to compact at {rollback_log}")
+        return
+
+    history = []
+    if os.path.exists(history_file):
+        history = load_json_file(history_file)
+    with open(rollback_log, 'rb') as f:
+        history.extend(parse_json(line) for line in f if line.strip())
+
+    tmp_path = f"{history_file}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(history, f, indent=2)
+    os.replace(tmp_path, history_file)
+    os.remove(rollback_log)
+    print(f"Compacted rollback history into {history_file} ({len(history)} entries)")
+
+
 def main():
     """Main function to rollback Portainer deployment."""
     args = parse_arguments()
+    if args.compact_history:
+        compact_history(os.path.dirname(args.artifact_path))
+        return
     validate_args(args)
     
     # Get the previous tag to rollback to
@@ -200,38 +340,39 @@ def main():
     )
     
     # Convert to YAML string
-    compose_content = yaml.dump(compose_data)
+    import yaml
+    compose_content = yaml.dump(
+        compose_data,
+        Dumper=getattr(yaml, 'CSafeDumper', yaml.SafeDumper),
+        sort_keys=False,
+        default_flow_style=False,
+        allow_unicode=True
+    )
+    
+    session = create_session(args.api_key)
     
     # Get stack ID
-    stack_id = get_stack_id(args.portainer_url, args.api_key, args.env_id, args.stack_name)
+    stack_id = get_stack_id(
+        session, args.portainer_url, args.env_id, args.stack_name, not args.no_cache
+    )
     if not stack_id:
         print(f"Error: Stack {args.stack_name} not found")
         sys.exit(1)
     
     # Update stack with previous version
     print(f"Rolling back stack {args.stack_name} to tag {previous_tag}...")
-    update_stack(args.portainer_url, args.api_key, stack_id, args.env_id, compose_content, pull=True)
+    update_stack(session, args.portainer_url, stack_id, args.env_id, compose_content, pull=True)
     
     print("Rollback completed successfully!")
     
-    # Record the rollback in a log file
+    # Record the rollback in an append-only log file
     try:
-        rollback_log = os.path.join(os.path.dirname(args.artifact_path), 'rollback_history.json')
-        history = []
-        if os.path.exists(rollback_log):
-            with open(rollback_log, 'r') as f:
-                history = json.load(f)
-        
-        history.append({
+        record_rollback(os.path.dirname(args.artifact_path), {
             'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
             'stack': args.stack_name,
             'environment': os.getenv('CI_COMMIT_REF_NAME', 'unknown'),
             'rolled_back_to': previous_tag
         })
-        
-        os.makedirs(os.path.dirname(rollback_log), exist_ok=True)
-        with open(rollback_log, 'w') as f:
-            json.dump(history, f, indent=2)
     except Exception as e:
         print(f"Warning: Could not record rollback history: {e}")
 
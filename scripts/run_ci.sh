@@ -19,7 +19,7 @@ pytest tests/unit --junitxml=reports/junit/unit.xml --alluredir=reports/allure-r
 
 echo "Integration tests"
 docker-compose -f docker-compose.integration.yml up -d
-pytest tests/integration --junitxml=reports/junit/integration.xml --alluredir=reports/allure-results --fixtures-per-test || (docker-compose -f docker-compose.integration.yml down && exit 1)
+pytest tests/integration -n auto --junitxml=reports/junit/integration.xml --alluredir=reports/allure-results --fixtures-per-test || (docker-compose -f docker-compose.integration.yml down && exit 1)
 docker-compose -f docker-compose.integration.yml down
 
 echo "Done"
@@ -2,7 +2,7 @@
 """
 Seed QA Data Script
 
-This script generates synthetic test data using Faker and saves it to JSON files.
+This script generates synthetic test data using Faker and saves it to NDJSON (default) or JSON files.
 It can be used to populate test environments with realistic but non-sensitive data.
 """
 
@@ -11,9 +11,13 @@ import json
 import os
 import random
 import sys
+import uuid
 from datetime import datetime, timedelta
 
-from faker import Faker
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 def parse_arguments():
     """Parse command line arguments."""
@@ -24,8 +28,10 @@ def parse_arguments():
                         help='Number of records to generate')
     parser.add_argument('--seed', type=int, default=None,
                         help='Random seed for reproducible data generation')
-    parser.add_argument('--out', default='data/test_users.json',
-                        help='Output file path')
+    parser.add_argument('--out', default=None,
+                        help='Output file path (default: data/test_<type>.<format>)')
+    parser.add_argument('--format', default='ndjson', choices=['ndjson', 'json'],
+                        help='Write one JSON object per line, or a single indented JSON array')
     parser.add_argument('--type', default='users', 
                         choices=['users', 'transactions', 'products', 'all'],
                         help='Type of data to generate')
@@ -37,93 +43,165 @@ def ensure_directory_exists(file_path):
     if directory and not os.path.exists(directory):
         os.makedirs(directory)
 
-def generate_users(fake, count):
+def write_json(file_path, records):
+    """Write records to file_path as indented JSON, using orjson when available."""
+    if orjson is not None:
+        with open(file_path, 'wb') as f:
+            f.write(orjson.dumps(records, option=orjson.OPT_INDENT_2))
+    else:
+        with open(file_path, 'w') as f:
+            json.dump(records, f, indent=2)
+
+def write_ndjson(file_path, records):
+    """Stream records to file_path as newline-delimited JSON, one record per line."""
+    if orjson is not None:
+        with open(file_path, 'wb') as f:
+            for record in records:
+                f.write(orjson.dumps(record))
+                f.write(b'\n')
+    else:
+        with open(file_path, 'w') as f:
+            for record in records:
+                f.write(json.dumps(record))
+                f.write('\n')
+
+def write_records(file_path, records, output_format):
+    """Write records in the requested output format."""
+    ensure_directory_exists(file_path)
+    if output_format == 'ndjson':
+        write_ndjson(file_path, records)
+    else:
+        write_json(file_path, records)
+
+def generate_ids(rng, count):
+    """Generate random UUID4 strings, reproducible under --seed."""
+    return [str(uuid.UUID(int=rng.getrandbits(128), version=4)) for _ in range(count)]
+
+def generate_timestamps(rng, count):
+    """Generate ISO timestamps between the start of this year and now."""
+    now = datetime.now()
+    start = datetime(now.year, 1, 1)
+    span = (now - start).total_seconds()
+    return [(start + timedelta(seconds=rng.uniform(0, span))).isoformat() for _ in range(count)]
+
+def generate_users(fake, rng, count):
     """Generate synthetic user data."""
-    users = []
-    for _ in range(count):
-        user = {
-            'id': fake.uuid4(),
-            'email': fake.email(),
-            'username': fake.user_name(),
-            'name': fake.name(),
-            'phone': fake.phone_number(),
+    ids = generate_ids(rng, count)
+    emails = [fake.email() for _ in range(count)]
+    usernames = [fake.user_name() for _ in range(count)]
+    names = [fake.name() for _ in range(count)]
+    phones = [fake.phone_number() for _ in range(count)]
+    streets = [fake.street_address() for _ in range(count)]
+    cities = [fake.city() for _ in range(count)]
+    states = [fake.state() for _ in range(count)]
+    zipcodes = [fake.zipcode() for _ in range(count)]
+    countries = [fake.country() for _ in range(count)]
+    created = generate_timestamps(rng, count)
+    active = rng.choices([True, False], k=count)
+    roles = rng.choices(['user', 'admin', 'tester', 'manager'], k=count)
+
+    return [
+        {
+            'id': ids[i],
+            'email': emails[i],
+            'username': usernames[i],
+            'name': names[i],
+            'phone': phones[i],
             'address': {
-                'street': fake.street_address(),
-                'city': fake.city(),
-                'state': fake.state(),
-                'zipcode': fake.zipcode(),
-                'country': fake.country()
+                'street': streets[i],
+                'city': cities[i],
+                'state': states[i],
+                'zipcode': zipcodes[i],
+                'country': countries[i]
             },
-            'created_at': fake.date_time_this_year().isoformat(),
-            'is_active': random.choice([True, False]),
-            'role': random.choice(['user', 'admin', 'tester', 'manager'])
+            'created_at': created[i],
+            'is_active': active[i],
+            'role': roles[i]
         }
-        users.append(user)
-    return users
+        for i in range(count)
+    ]
 
-def generate_transactions(fake, count, user_ids=None):
+def generate_transactions(fake, rng, count, user_ids=None):
     """Generate synthetic transaction data."""
     if not user_ids:
-        user_ids = [fake.uuid4() for _ in range(count // 5)]
+        user_ids = generate_ids(rng, count // 5)
     
-    transactions = []
-    for _ in range(count):
-        transaction = {
-            'id': fake.uuid4(),
-            'user_id': random.choice(user_ids),
-            'amount': round(random.uniform(10.0, 1000.0), 2),
-            'currency': random.choice(['USD', 'EUR', 'GBP', 'NGN']),
-            'status': random.choice(['completed', 'pending', 'failed', 'refunded']),
-            'type': random.choice(['payment', 'refund', 'deposit', 'withdrawal']),
-            'created_at': fake.date_time_this_year().isoformat(),
-            'updated_at': fake.date_time_this_year().isoformat(),
-            'reference': fake.bothify(text='TRX-????-########'),
-            'description': fake.sentence()
+    ids = generate_ids(rng, count)
+    owners = rng.choices(user_ids, k=count)
+    amounts = [round(rng.uniform(10.0, 1000.0), 2) for _ in range(count)]
+    currencies = rng.choices(['USD', 'EUR', 'GBP', 'NGN'], k=count)
+    statuses = rng.choices(['completed', 'pending', 'failed', 'refunded'], k=count)
+    types = rng.choices(['payment', 'refund', 'deposit', 'withdrawal'], k=count)
+    created = generate_timestamps(rng, count)
+    updated = generate_timestamps(rng, count)
+    references = [fake.bothify(text='TRX-????-########') for _ in range(count)]
+    descriptions = [fake.sentence() for _ in range(count)]
+
+    return [
+        {
+            'id': ids[i],
+            'user_id': owners[i],
+            'amount': amounts[i],
+            'currency': currencies[i],
+            'status': statuses[i],
+            'type': types[i],
+            'created_at': created[i],
+            'updated_at': updated[i],
+            'reference': references[i],
+            'description': descriptions[i]
         }
-        transactions.append(transaction)
-    return transactions
+        for i in range(count)
+    ]
 
-def generate_products(fake, count):
+def generate_products(fake, rng, count):
     """Generate synthetic product data."""
     categories = ['Electronics', 'Clothing', 'Books', 'Home', 'Beauty', 'Sports', 'Food']
-    products = []
-    for _ in range(count):
-        product = {
-            'id': fake.uuid4(),
-            'name': fake.catch_phrase(),
-            'description': fake.paragraph(),
-            'price': round(random.uniform(5.0, 500.0), 2),
-            'category': random.choice(categories),
-            'sku': fake.bothify(text='SKU-????-########'),
-            'in_stock': random.choice([True, False]),
-            'stock_quantity': random.randint(0, 100),
-            'created_at': fake.date_time_this_year().isoformat(),
-            'updated_at': fake.date_time_this_year().isoformat()
+    ids = generate_ids(rng, count)
+    names = [fake.catch_phrase() for _ in range(count)]
+    descriptions = [fake.paragraph() for _ in range(count)]
+    prices = [round(rng.uniform(5.0, 500.0), 2) for _ in range(count)]
+    picked_categories = rng.choices(categories, k=count)
+    skus = [fake.bothify(text='SKU-????-########') for _ in range(count)]
+    in_stock = rng.choices([True, False], k=count)
+    quantities = [rng.randint(0, 100) for _ in range(count)]
+    created = generate_timestamps(rng, count)
+    updated = generate_timestamps(rng, count)
+
+    return [
+        {
+            'id': ids[i],
+            'name': names[i],
+            'description': descriptions[i],
+            'price': prices[i],
+            'category': picked_categories[i],
+            'sku': skus[i],
+            'in_stock': in_stock[i],
+            'stock_quantity': quantities[i],
+            'created_at': created[i],
+            'updated_at': updated[i]
         }
-        products.append(product)
-    return products
+        for i in range(count)
+    ]
 
 def main():
     """Main function to generate and save test data."""
     args = parse_arguments()
     
-    # Set random seed if provided
+    from faker import Faker
+
+    # A local RNG keeps draws off the shared module-level random state
+    rng = random.Random(args.seed)
+    fake = Faker()
     if args.seed is not None:
-        random.seed(args.seed)
-        fake = Faker()
         Faker.seed(args.seed)
-    else:
-        fake = Faker()
     
     print(f"Generating {args.count} records of {args.type} data for {args.env} environment...")
     
     # Generate data based on type
     if args.type == 'users' or args.type == 'all':
-        users = generate_users(fake, args.count)
-        user_file = args.out if args.type == 'users' else 'data/test_users.json'
-        ensure_directory_exists(user_file)
-        with open(user_file, 'w') as f:
-            json.dump(users, f, indent=2)
+        users = generate_users(fake, rng, args.count)
+        user_file = args.out if args.type == 'users' and args.out else f'data/test_users.{args.format}'
+        write_records(user_file, users, args.format)
         print(f"Generated {len(users)} users and saved to {user_file}")
         
         # Extract user IDs for transactions if generating all
@@ -132,19 +210,15 @@ def main():
         user_ids = None
     
     if args.type == 'transactions' or args.type == 'all':
-        transactions = generate_transactions(fake, args.count, user_ids)
-        transaction_file = args.out if args.type == 'transactions' else 'data/test_transactions.json'
-        ensure_directory_exists(transaction_file)
-        with open(transaction_file, 'w') as f:
-            json.dump(transactions, f, indent=2)
+        transactions = generate_transactions(fake, rng, args.count, user_ids)
+        transaction_file = args.out if args.type == 'transactions' and args.out else f'data/test_transactions.{args.format}'
+        write_records(transaction_file, transactions, args.format)
         print(f"Generated {len(transactions)} transactions and saved to {transaction_file}")
     
     if args.type == 'products' or args.type == 'all':
-        products = generate_products(fake, args.count)
-        product_file = args.out if args.type == 'products' else 'data/test_products.json'
-        ensure_directory_exists(product_file)
-        with open(product_file, 'w') as f:
-            json.dump(products, f, indent=2)
+        products = generate_products(fake, rng, args.count)
+        product_file = args.out if args.type == 'products' and args.out else f'data/test_products.{args.format}'
+        write_records(product_file, products, args.format)
         print(f"Generated {len(products)} products and saved to {product_file}")
     
     print("Data Seeding Completed Successfully!")
@@ -6,16 +6,35 @@ Requires env: AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY, AWS_DEFAULT_REGION, and
 import argparse
 import os
 import sys
-import boto3
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import PurePath, PurePosixPath
 
+# Parallel parts per multipart upload; each upload worker may use this many connections
+TRANSFER_CONCURRENCY = 4
 
-def upload_directory(s3, bucket: str, prefix: str, local_path: str) -> None:
-    for root, _, files in os.walk(local_path):
-        for name in files:
-            full = os.path.join(root, name)
-            key = os.path.join(prefix, os.path.relpath(full, start=local_path)).replace("\\", "/")
-            print(f"Uploading {full} -> s3://{bucket}/{key}")
-            s3.upload_file(full, bucket, key)
+
+def iter_files(path: str):
+    """Yield a DirEntry for every regular file under path, without following directory symlinks."""
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                yield from iter_files(entry.path)
+            elif entry.is_file():
+                yield entry
+
+
+def upload_directory(s3, bucket: str, prefix: str, local_path: str, workers: int = 16) -> None:
+    from boto3.s3.transfer import TransferConfig
+
+    config = TransferConfig(multipart_threshold=8 * 1024 * 1024, max_concurrency=TRANSFER_CONCURRENCY, use_threads=True)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = []
+        for entry in iter_files(local_path):
+            key = PurePosixPath(prefix, PurePath(entry.path).relative_to(local_path).as_posix()).as_posix()
+            print(f"Uploading {entry.path} -> s3://{bucket}/{key}")
+            futures.append(executor.submit(s3.upload_file, entry.path, bucket, key, Config=config))
+        for future in futures:
+            future.result()
 
 
 def main():
@@ -23,17 +42,23 @@ def main():
     parser.add_argument("--bucket", required=True)
     parser.add_argument("--prefix", required=True)
     parser.add_argument("--path", required=True)
+    parser.add_argument("--workers", type=int, default=16)
     args = parser.parse_args()
 
-    session = boto3.session.Session()
-    endpoint = os.getenv("AWS_ENDPOINT_URL")
-    s3 = session.client("s3", endpoint_url=endpoint) if endpoint else session.client("s3")
-
     if not os.path.isdir(args.path):
         print(f"Path not found: {args.path}", file=sys.stderr)
         sys.exit(1)
 
-    upload_directory(s3, args.bucket, args.prefix, args.path)
+    import boto3
+    from botocore.config import Config
+
+    session = boto3.session.Session()
+    endpoint = os.getenv("AWS_ENDPOINT_URL")
+    # Size the pool for every worker's multipart parts so connections are reused, not discarded
+    client_config = Config(max_pool_connections=args.workers * TRANSFER_CONCURRENCY)
+    s3 = session.client("s3", endpoint_url=endpoint, config=client_config) if endpoint else session.client("s3", config=client_config)
+
+    upload_directory(s3, args.bucket, args.prefix, args.path, args.workers)
 
 
 if __name__ == "__main__":
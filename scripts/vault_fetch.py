@@ -6,7 +6,7 @@ Example: SECRET_PATHS="secret/data/ci/docker=DOCKER,secret/data/ci/portainer=POR
 
 import os
 import sys
-import hvac
+from concurrent.futures import ThreadPoolExecutor
 
 
 def main():
@@ -15,7 +15,16 @@ def main():
         print("VAULT_ADDR not set; skipping Vault fetch")
         return
 
+    import hvac
+    from requests.adapters import HTTPAdapter
+
+    secret_specs = [spec for spec in os.getenv("SECRET_PATHS", "").split(",") if spec]
+    workers = max(1, min(8, len(secret_specs)))
+
+    # Size hvac's own session for the concurrent reads below; passing a fresh
+    # session in would replace the VAULT_CACERT/VAULT_CAPATH verify setting
     client = hvac.Client(url=vault_addr)
+    client.adapter.session.mount("https://", HTTPAdapter(pool_maxsize=workers))
 
     # Basic token auth for simplicity; extend to approle/oidc as needed
     token = os.getenv("VAULT_TOKEN")
@@ -25,11 +34,16 @@ def main():
         print("Vault authentication failed", file=sys.stderr)
         sys.exit(1)
 
-    secret_specs = os.getenv("SECRET_PATHS", "").split(",")
-    for spec in filter(None, secret_specs):
-        path, _, prefix = spec.partition("=")
-        prefix = prefix or "SECRET"
-        read = client.secrets.kv.v2.read_secret_version(path=path)
+    def read_secret(spec):
+        path = spec.partition("=")[0]
+        return client.secrets.kv.v2.read_secret_version(path=path)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(read_secret, secret_specs))
+
+    # Print in SECRET_PATHS order so later specs still override earlier ones
+    for spec, read in zip(secret_specs, results):
+        prefix = spec.partition("=")[2] or "SECRET"
         data = read.get("data", {}).get("data", {})
         for key, value in data.items():
             env_key = f"{prefix}_{key}".upper()
@@ -4,6 +4,8 @@ Math utility functions.
 This module provides basic math operations.
 """
 
+import math
+
 
 def add(a, b):
     """
@@ -83,9 +85,7 @@ def factorial(n):
         raise TypeError("Input must be an integer")
     if n < 0:
         raise ValueError("Factorial is not defined for negative numbers")
-    if n == 0 or n == 1:
-        return 1
-    return n * factorial(n - 1)
+    return math.factorial(n)
 
 
 def fibonacci(n):
@@ -105,8 +105,21 @@ def fibonacci(n):
         raise TypeError("Input must be an integer")
     if n < 0:
         raise ValueError("Fibonacci is not defined for negative numbers")
+    return _fibonacci_pair(n)[0]
+
+
+def _fibonacci_pair(n):
+    """
+    Return (F(n), F(n + 1)) using the fast-doubling identities.
+    
+    F(2k) = F(k) * (2 * F(k + 1) - F(k)) and F(2k + 1) = F(k)^2 + F(k + 1)^2,
+    so only O(log n) big-integer multiplications are needed.
+    """
     if n == 0:
-        return 0
-    if n == 1:
-        return 1
-    return fibonacci(n - 1) + fibonacci(n - 2)
\ No newline at end of file
+        return (0, 1)
+    a, b = _fibonacci_pair(n >> 1)
+    c = a * ((b << 1) - a)
+    d = a * a + b * b
+    if n & 1:
+        return (d, c + d)
+    return (c, d)
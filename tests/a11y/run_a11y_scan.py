@@ -10,6 +10,21 @@ import subprocess
 import sys
 
 
+def peek_yaml_key(path: str, key: str, max_lines: int = 50):
+    """Return the first value for key in the head of a YAML file without parsing it."""
+    prefix = f"{key}:"
+    with open(path, "r", encoding="utf-8") as f:
+        for lineno, line in enumerate(f):
+            if lineno >= max_lines:
+                break
+            stripped = line.strip()
+            if stripped.startswith(prefix):
+                # Drop an inline "# comment" before unquoting the value
+                value = stripped.split(":", 1)[1].split(" #", 1)[0]
+                return value.strip().strip("'\"") or None
+    return None
+
+
 def run_axe_cli(url: str, out_path: str) -> int:
     axe = shutil.which("axe") or shutil.which("npx")
     if not axe:
@@ -28,11 +43,7 @@ def main():
     cfg_file = os.path.join("configs", f"{env}.yaml")
     if os.path.exists(cfg_file):
         try:
-            with open(cfg_file, "r", encoding="utf-8") as f:
-                for line in f:
-                    if line.strip().startswith("host:"):
-                        host = line.split()[1].strip()
-                        break
+            host = peek_yaml_key(cfg_file, "host") or host
         except Exception:
             pass
     url = f"https://{host}"
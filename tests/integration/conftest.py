@@ -0,0 +1,146 @@
+"""
+Shared fixtures for the database integration tests.
+
+The schema is created once per session from schema.sql; each test then runs
+in a transaction on a pooled connection that is rolled back when it is returned.
+
+Bulk data goes through the helpers in db_helpers.py (COPY, execute_values and
+execute_batch) rather than row-at-a-time executemany.
+"""
+
+import ipaddress
+import os
+import socket
+import pytest
+
+# Skip the whole directory cleanly where the database driver isn't installed
+psycopg2 = pytest.importorskip("psycopg2")
+from psycopg2.pool import ThreadedConnectionPool  # noqa: E402
+
+
+# Database connection parameters - would typically come from environment variables
+DB_PARAMS = {
+    'host': os.getenv('DB_HOST', 'localhost'),
+    'port': os.getenv('DB_PORT', '5432'),
+    'user': os.getenv('DB_USER', 'qa_user'),
+    'password': os.getenv('DB_PASSWORD', 'qa_password'),
+    'database': os.getenv('DB_NAME', 'qa_db')
+}
+
+# Each pytest-xdist worker gets its own schema so parallel runs never share test_users
+WORKER_SCHEMA = f"test_{os.environ.get('PYTEST_XDIST_WORKER', 'master')}"
+DB_PARAMS['options'] = f"-c search_path={WORKER_SCHEMA}"
+
+SCHEMA_FILE = os.path.join(os.path.dirname(__file__), 'schema.sql')
+
+# Server-side prepared statements for the queries the tests repeat
+PREPARED_STATEMENTS = """
+    PREPARE ins_user(text, text) AS
+        INSERT INTO test_users (username, email) VALUES ($1, $2)
+        RETURNING id, username, email;
+    PREPARE sel_user(text) AS
+        SELECT username, email FROM test_users WHERE username = $1;
+    PREPARE upd_email(text, text) AS
+        UPDATE test_users SET email = $1 WHERE username = $2 RETURNING email;
+    PREPARE del_user(text) AS
+        DELETE FROM test_users WHERE username = $1 RETURNING id;
+"""
+
+
+def resolve_hostaddr(host):
+    """Return one address to pin for host, or None where pinning doesn't apply."""
+    # Socket directories, host lists and literal addresses need no lookup
+    if not host or host.startswith(('/', '@')) or ',' in host:
+        return None
+    try:
+        ipaddress.ip_address(host)
+        return None
+    except ValueError:
+        pass
+    try:
+        addresses = {info[4][0] for info in socket.getaddrinfo(host, None, type=socket.SOCK_STREAM)}
+    except socket.gaierror:
+        return None
+    # Several addresses (e.g. ::1 and 127.0.0.1) are left to libpq, which
+    # falls through them in turn; pinning one would drop that fallback
+    if len(addresses) != 1:
+        return None
+    return addresses.pop()
+
+
+class PreparedConnection(psycopg2.extensions.connection):
+    """Connection that remembers its prepared statements and reusable cursor."""
+    prepared = False
+    shared_cursor = None
+
+
+@pytest.fixture(scope="session")
+def db_pool():
+    """Create a connection pool shared by the whole test session."""
+    # Resolve the host once so libpq skips DNS on every pooled connect, and
+    # build the connection string once instead of re-formatting kwargs
+    params = dict(DB_PARAMS)
+    hostaddr = resolve_hostaddr(params['host'])
+    if hostaddr:
+        params['hostaddr'] = hostaddr
+    dsn = psycopg2.extensions.make_dsn(**params)
+
+    # Connect to PostgreSQL server
+    pool = ThreadedConnectionPool(
+        minconn=2,
+        maxconn=(os.cpu_count() or 1) * 2,
+        dsn=dsn,
+        connection_factory=PreparedConnection
+    )
+    yield pool
+    pool.closeall()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def db_schema(db_pool):
+    """Create the worker's schema and tables once and drop them at the end."""
+    with open(SCHEMA_FILE) as f:
+        schema_sql = f.read()
+
+    conn = db_pool.getconn()
+
+    # Apply the whole DDL script in one round-trip; the connection block
+    # commits the setup once
+    with conn, conn.cursor() as cursor:
+        cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {WORKER_SCHEMA}; {schema_sql}")
+    db_pool.putconn(conn)
+
+    yield
+
+    # Clean up after tests
+    conn = db_pool.getconn()
+    with conn, conn.cursor() as cursor:
+        cursor.execute(f"DROP SCHEMA IF EXISTS {WORKER_SCHEMA} CASCADE")
+    db_pool.putconn(conn)
+
+
+@pytest.fixture
+def db_connection(db_pool):
+    """Check a connection out of the pool for the duration of a test."""
+    conn = db_pool.getconn()
+    if not conn.prepared:
+        # Prepared statements live as long as the server session, so each
+        # pooled connection only pays for them once
+        with conn, conn.cursor() as cursor:
+            cursor.execute(PREPARED_STATEMENTS)
+        conn.prepared = True
+        # Tests reuse one cursor per pooled connection; it is closed
+        # together with the connection when the pool shuts down
+        conn.shared_cursor = conn.cursor()
+    try:
+        yield conn
+    finally:
+        # Discard everything the test wrote
+        conn.rollback()
+        db_pool.putconn(conn)
+
+
+@pytest.fixture
+def db_cursor(db_connection):
+    """Hand out the connection's cursor; db_connection rolls back its changes."""
+    return db_connection.shared_cursor
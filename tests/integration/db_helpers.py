@@ -0,0 +1,42 @@
+"""
+Bulk data helpers for the database integration tests.
+
+Bulk test data never goes through row-at-a-time executemany: seed with COPY
+(load_users), insert with a multi-VALUES execute_values (bulk_insert_users),
+and batch other per-row statements with execute_batch (delete_users).
+"""
+
+import csv
+import io
+
+from psycopg2.extras import execute_batch, execute_values
+
+
+def bulk_insert_users(cursor, rows):
+    """Insert (username, email) rows in a single round-trip and return their ids."""
+    result = execute_values(
+        cursor,
+        "INSERT INTO test_users (username, email) VALUES %s RETURNING id",
+        rows,
+        page_size=1000,
+        fetch=True
+    )
+    return [row[0] for row in result]
+
+
+def delete_users(cursor, usernames):
+    """Delete users by username, sending the statements in pages of 100."""
+    execute_batch(
+        cursor,
+        "DELETE FROM test_users WHERE username = %s",
+        [(username,) for username in usernames],
+        page_size=100
+    )
+
+
+def load_users(cursor, rows):
+    """Stream (username, email) rows into test_users with COPY for bulk seeding."""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    cursor.copy_expert("COPY test_users (username, email) FROM STDIN WITH CSV", buffer)
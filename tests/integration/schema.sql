@@ -0,0 +1,10 @@
+-- Schema for the database integration tests, applied once per session
+CREATE TABLE IF NOT EXISTS test_users (
+    id SERIAL PRIMARY KEY,
+    username VARCHAR(100) NOT NULL UNIQUE,
+    email VARCHAR(255) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Clear rows left behind by an interrupted earlier run
+TRUNCATE test_users RESTART IDENTITY;
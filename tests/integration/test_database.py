@@ -2,103 +2,39 @@
 Integration tests for database operations.
 
 This module contains integration tests that interact with a PostgreSQL database.
+Fixtures and the schema setup live in conftest.py, bulk helpers in db_helpers.py.
 """
 
-import os
 import pytest
-import psycopg2
-from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
-
-
-# Database connection parameters - would typically come from environment variables
-DB_PARAMS = {
-    'host': os.getenv('DB_HOST', 'localhost'),
-    'port': os.getenv('DB_PORT', '5432'),
-    'user': os.getenv('DB_USER', 'qa_user'),
-    'password': os.getenv('DB_PASSWORD', 'qa_password'),
-    'database': os.getenv('DB_NAME', 'qa_db')
-}
-
-
-@pytest.fixture(scope="module")
-def db_connection():
-    """Create a database connection for testing."""
-    # Connect to PostgreSQL server
-    conn = psycopg2.connect(
-        host=DB_PARAMS['host'],
-        port=DB_PARAMS['port'],
-        user=DB_PARAMS['user'],
-        password=DB_PARAMS['password'],
-        database=DB_PARAMS['database']
-    )
-    conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
-    
-    # Create a test table
-    with conn.cursor() as cursor:
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS test_users (
-                id SERIAL PRIMARY KEY,
-                username VARCHAR(100) NOT NULL UNIQUE,
-                email VARCHAR(255) NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-    
-    yield conn
-    
-    # Clean up after tests
-    with conn.cursor() as cursor:
-        cursor.execute("DROP TABLE IF EXISTS test_users")
-    
-    conn.close()
 
+# Skip the module cleanly where the database driver isn't installed
+psycopg2 = pytest.importorskip("psycopg2")
+from psycopg2 import errorcodes  # noqa: E402
 
-@pytest.fixture
-def db_cursor(db_connection):
-    """Create a database cursor for executing queries."""
-    cursor = db_connection.cursor()
-    yield cursor
-    
-    # Clean up test data after each test
-    cursor.execute("DELETE FROM test_users")
-    cursor.close()
+from db_helpers import bulk_insert_users, delete_users, load_users  # noqa: E402
+
+pytestmark = pytest.mark.integration
 
 
 def test_insert_user(db_cursor):
     """Test inserting a user into the database."""
-    # Insert a user
-    db_cursor.execute(
-        "INSERT INTO test_users (username, email) VALUES (%s, %s) RETURNING id",
-        ("testuser", "test@example.com")
-    )
-    user_id = db_cursor.fetchone()[0]
-    
-    # Verify the user was inserted
-    db_cursor.execute("SELECT username, email FROM test_users WHERE id = %s", (user_id,))
+    # Insert a user; RETURNING hands back the stored row in the same round-trip
+    db_cursor.execute("EXECUTE ins_user(%s, %s)", ("testuser", "test@example.com"))
     user = db_cursor.fetchone()
     
     assert user is not None
-    assert user[0] == "testuser"
-    assert user[1] == "test@example.com"
+    assert user[1] == "testuser"
+    assert user[2] == "test@example.com"
 
 
 def test_update_user(db_cursor):
     """Test updating a user in the database."""
-    # Insert a user
+    # Insert and update the user in a single round-trip; the statements are
+    # keyed on the unique username and only the last result set comes back
     db_cursor.execute(
-        "INSERT INTO test_users (username, email) VALUES (%s, %s) RETURNING id",
-        ("updateuser", "update@example.com")
+        "EXECUTE ins_user(%s, %s); EXECUTE upd_email(%s, %s)",
+        ("updateuser", "update@example.com", "updated@example.com", "updateuser")
     )
-    user_id = db_cursor.fetchone()[0]
-    
-    # Update the user
-    db_cursor.execute(
-        "UPDATE test_users SET email = %s WHERE id = %s",
-        ("updated@example.com", user_id)
-    )
-    
-    # Verify the user was updated
-    db_cursor.execute("SELECT email FROM test_users WHERE id = %s", (user_id,))
     email = db_cursor.fetchone()[0]
     
     assert email == "updated@example.com"
@@ -106,18 +42,12 @@ def test_update_user(db_cursor):
 
 def test_delete_user(db_cursor):
     """Test deleting a user from the database."""
-    # Insert a user
+    # Insert, delete and look the user up again in a single round-trip; each
+    # statement takes a fresh snapshot, so the lookup sees the delete
     db_cursor.execute(
-        "INSERT INTO test_users (username, email) VALUES (%s, %s) RETURNING id",
-        ("deleteuser", "delete@example.com")
+        "EXECUTE ins_user(%s, %s); EXECUTE del_user(%s); EXECUTE sel_user(%s)",
+        ("deleteuser", "delete@example.com", "deleteuser", "deleteuser")
     )
-    user_id = db_cursor.fetchone()[0]
-    
-    # Delete the user
-    db_cursor.execute("DELETE FROM test_users WHERE id = %s", (user_id,))
-    
-    # Verify the user was deleted
-    db_cursor.execute("SELECT * FROM test_users WHERE id = %s", (user_id,))
     user = db_cursor.fetchone()
     
     assert user is None
@@ -126,16 +56,48 @@ def test_delete_user(db_cursor):
 def test_unique_constraint(db_cursor):
     """Test that the unique constraint on username works."""
     # Insert a user
-    db_cursor.execute(
-        "INSERT INTO test_users (username, email) VALUES (%s, %s)",
-        ("uniqueuser", "unique@example.com")
-    )
+    db_cursor.execute("EXECUTE ins_user(%s, %s)", ("uniqueuser", "unique@example.com"))
     
-    # Try to insert another user with the same username
+    # Try to insert another user with the same username; the nested savepoint
+    # keeps the failed statement from aborting the test's transaction
+    db_cursor.execute("SAVEPOINT unique_check")
     with pytest.raises(psycopg2.IntegrityError) as excinfo:
-        db_cursor.execute(
-            "INSERT INTO test_users (username, email) VALUES (%s, %s)",
-            ("uniqueuser", "another@example.com")
-        )
+        db_cursor.execute("EXECUTE ins_user(%s, %s)", ("uniqueuser", "another@example.com"))
+    db_cursor.execute("ROLLBACK TO SAVEPOINT unique_check")
+
+    assert excinfo.value.pgcode == errorcodes.UNIQUE_VIOLATION
+
+    # The original user is still there
+    db_cursor.execute("EXECUTE sel_user(%s)", ("uniqueuser",))
+    assert db_cursor.fetchone()[1] == "unique@example.com"
+
+
+def test_bulk_insert_users(db_cursor):
+    """Test inserting many users in one batched statement."""
+    rows = [(f"bulkuser{i}", f"bulk{i}@example.com") for i in range(500)]
+    user_ids = bulk_insert_users(db_cursor, rows)
     
-    assert "duplicate key value violates unique constraint" in str(excinfo.value)
\ No newline at end of file
+    assert len(user_ids) == len(rows)
+    db_cursor.execute("SELECT count(*) FROM test_users")
+    assert db_cursor.fetchone()[0] == len(rows)
+
+
+def test_load_users(db_cursor):
+    """Test seeding many users through COPY."""
+    rows = [(f"copyuser{i}", f"copy{i}@example.com") for i in range(5000)]
+    load_users(db_cursor, rows)
+
+    db_cursor.execute("SELECT count(*) FROM test_users")
+    assert db_cursor.fetchone()[0] == len(rows)
+    db_cursor.execute("EXECUTE sel_user(%s)", ("copyuser4999",))
+    assert db_cursor.fetchone()[1] == "copy4999@example.com"
+
+
+def test_delete_users(db_cursor):
+    """Test deleting many users in batched round-trips."""
+    rows = [(f"batchuser{i}", f"batch{i}@example.com") for i in range(500)]
+    load_users(db_cursor, rows)
+    delete_users(db_cursor, [username for username, _ in rows[:300]])
+
+    db_cursor.execute("SELECT count(*) FROM test_users")
+    assert db_cursor.fetchone()[0] == 200
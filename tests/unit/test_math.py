@@ -4,47 +4,87 @@ Unit tests for math functions.
 This module contains unit tests for basic math functions.
 """
 
+import functools
+import operator
+import sys
+
 import pytest
-from src.utils.math_utils import add, subtract, multiply, divide
+from src.utils.math_utils import add, subtract, multiply, divide, factorial, fibonacci
+
+
+@pytest.mark.parametrize("op, a, b, expected", [
+    (add, 2, 3, 5),
+    (add, -1, 1, 0),
+    (add, 0, 0, 0),
+    (add, 1.5, 2.5, 4.0),
+    (subtract, 5, 3, 2),
+    (subtract, 1, 1, 0),
+    (subtract, 0, 5, -5),
+    (subtract, 10.5, 0.5, 10.0),
+    (multiply, 2, 3, 6),
+    (multiply, -1, 1, -1),
+    (multiply, 0, 5, 0),
+    (multiply, 2.5, 2, 5.0),
+    (divide, 6, 3, 2),
+    (divide, 1, 1, 1),
+    (divide, 0, 5, 0),
+    (divide, 5, 2, 2.5),
+])
+def test_binary_op(op, a, b, expected):
+    """Test add, subtract, multiply and divide with a shared table of inputs."""
+    assert op(a, b) == expected
 
 
-def test_add():
-    """Test the add function."""
-    assert add(2, 3) == 5
-    assert add(-1, 1) == 0
-    assert add(0, 0) == 0
-    assert add(1.5, 2.5) == 4.0
+def test_divide_by_zero():
+    """Test division by zero raises an exception."""
+    with pytest.raises(ValueError) as excinfo:
+        divide(5, 0)
+    assert "Cannot divide by zero" in str(excinfo.value)
 
 
-def test_subtract():
-    """Test the subtract function."""
-    assert subtract(5, 3) == 2
-    assert subtract(1, 1) == 0
-    assert subtract(0, 5) == -5
-    assert subtract(10.5, 0.5) == 10.0
+def test_factorial():
+    """Test the factorial function."""
+    assert factorial(0) == 1
+    assert factorial(1) == 1
+    assert factorial(5) == 120
+    assert factorial(10) == 3628800
 
 
-def test_multiply():
-    """Test the multiply function."""
-    assert multiply(2, 3) == 6
-    assert multiply(-1, 1) == -1
-    assert multiply(0, 5) == 0
-    assert multiply(2.5, 2) == 5.0
+def test_factorial_beyond_recursion_limit():
+    """Test factorial handles inputs deeper than the interpreter recursion limit."""
+    n = sys.getrecursionlimit() + 1000
+    assert factorial(n) == functools.reduce(operator.mul, range(1, n + 1), 1)
 
 
-def test_divide():
-    """Test the divide function."""
-    assert divide(6, 3) == 2
-    assert divide(1, 1) == 1
-    assert divide(0, 5) == 0
-    assert divide(5, 2) == 2.5
+def test_factorial_invalid_input():
+    """Test factorial rejects negative and non-integer input."""
+    with pytest.raises(ValueError):
+        factorial(-1)
+    with pytest.raises(TypeError):
+        factorial(2.5)
 
 
-def test_divide_by_zero():
-    """Test division by zero raises an exception."""
-    with pytest.raises(ValueError) as excinfo:
-        divide(5, 0)
-    assert "Cannot divide by zero" in str(excinfo.value)
+def test_fibonacci():
+    """Test the fibonacci function."""
+    assert [fibonacci(n) for n in range(10)] == [0, 1, 1, 2, 3, 5, 8, 13, 21, 34]
+    assert fibonacci(90) == 2880067194370816120
+
+
+def test_fibonacci_large_input():
+    """Test fibonacci agrees with the iterative definition for large n."""
+    a, b = 0, 1
+    for _ in range(5000):
+        a, b = b, a + b
+    assert fibonacci(5000) == a
+    assert fibonacci(5001) == b
+
+
+def test_fibonacci_invalid_input():
+    """Test fibonacci rejects negative and non-integer input."""
+    with pytest.raises(ValueError):
+        fibonacci(-1)
+    with pytest.raises(TypeError):
+        fibonacci(2.5)
 
 
 @pytest.mark.parametrize("a, b, expected", [
@@ -61,7 +101,6 @@ def test_add_parametrized(a, b, expected):
 @pytest.mark.slow
 def test_complex_calculation():
     """A more complex test marked as slow."""
-    result = 0
-    for i in range(1000000):
-        result = add(result, i)
-    assert result == 499999500000
\ No newline at end of file
+    n = 1_000_000
+    # One call with large operands checks add against the closed-form sum
+    assert add(sum(range(n)), 0) == n * (n - 1) // 2
\ No newline at end of file